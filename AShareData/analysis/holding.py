@@ -1,6 +1,7 @@
 import datetime as dt
 
 import pandas as pd
+from sqlalchemy import text
 
 from .. import utils
 from ..ashare_data_reader import AShareDataReader
@@ -65,7 +66,7 @@ class FundHolding(object):
     def get_holding(self, date: dt.datetime, fund: str = None) -> pd.DataFrame:
         sql = None
         if fund and fund != 'ALL':
-            sql = f'accountName = "{fund}"'
+            sql = text('accountName = :fund').bindparams(fund=fund)
         data = self.db_interface.read_table('持仓记录', dates=date, text_statement=sql)
         if fund:
             data = data.groupby(['DateTime', 'windCode'])['quantity'].sum()
@@ -963,10 +963,12 @@ class TushareData(DataSource):
 
         rate_limiter = RateLimiter(rate - 1, period=60)
         report_period = None
+        manager_type_groups = fund_manager_info.groupby(['管理人', '投资类型'], sort=False).indices
         for manager in managers:
             for investment_type in ['灵活配置型基金', '偏股混合型基金']:
-                mask = (fund_manager_info['管理人'] == manager) & (fund_manager_info['投资类型'] == investment_type)
-                tickers = fund_manager_info.loc[mask, :].index.tolist()
+                if (manager, investment_type) not in manager_type_groups:
+                    continue
+                tickers = fund_manager_info.index.take(manager_type_groups[(manager, investment_type)]).tolist()
                 checker = False
                 for ticker in tickers:
                     holding = self.db_interface.read_table('公募基金持仓', ids=ticker)
@@ -987,9 +989,9 @@ class TushareData(DataSource):
 
         tickers = FundWithStocksTickers(self.db_interface).ticker()
         storage = []
+        manager_groups = fund_manager_info.groupby('管理人', sort=False).indices
         for manager in update_managers:
-            man_ticker = set(tickers) & set(
-                fund_manager_info.loc[fund_manager_info['管理人'] == manager, :].index.tolist())
+            man_ticker = set(tickers) & set(fund_manager_info.index.take(manager_groups[manager]).tolist())
             storage.extend(list(man_ticker))
         self.update_fund_portfolio(storage[25:], report_period)
 
@@ -1089,37 +1091,26 @@ class TushareData(DataSource):
 
     @staticmethod
     def append_report_date_cache(data: pd.DataFrame) -> pd.DataFrame:
-        dates = data.index.get_level_values('DateTime').unique()
+        if not data.index.is_monotonic_increasing:
+            data = data.sort_index()
+        record_dates = data.index.get_level_values('DateTime')
+        report_dates = data.index.get_level_values('报告期')
+        offset_strs = ['q1', 'q2', 'q4', 'q5', 'y1', 'y2', 'y3', 'y5']
+
+        # position after the last record announced on or before each announcement date
+        ends = record_dates.searchsorted(record_dates.unique(), side='right')
         storage = []
-
-        def deal_data(report_date, offset_str: str):
-            pre_report_date = date_utils.ReportingDate.offset(report_date, offset_str)
-            pre_record = info.loc[info.index.get_level_values('报告期') == pre_report_date].tail(1)
-            pre_date = None if pre_record.empty else pre_record.index.get_level_values('DateTime')[0]
-            return pre_date
-
-        for date in dates:
-            info = data.loc[data.index.get_level_values('DateTime') <= date, :]
-            newest_entry = info.tail(1)
-            report_date = pd.to_datetime(newest_entry.index.get_level_values('报告期')[0])
-
-            # quarterly
-            q1 = deal_data(report_date, 'q1')
-            q2 = deal_data(report_date, 'q2')
-            q4 = deal_data(report_date, 'q4')
-            q5 = deal_data(report_date, 'q5')
-
-            # yearly
-            y1 = deal_data(report_date, 'y1')
-            y2 = deal_data(report_date, 'y2')
-            y3 = deal_data(report_date, 'y3')
-            y5 = deal_data(report_date, 'y5')
-
-            res = pd.DataFrame([q1, q2, q4, q5, y1, y2, y3, y5]).T.set_index(newest_entry.index)
-            res.columns = ['q1', 'q2', 'q4', 'q5', 'y1', 'y2', 'y3', 'y5']
-            storage.append(res)
-
-        cache = pd.concat(storage)
+        for end in ends:
+            report_date = report_dates[end - 1]
+            known_report_dates = report_dates[:end]
+            pre_dates = []
+            for offset_str in offset_strs:
+                pre_report_date = date_utils.ReportingDate.offset(report_date, offset_str)
+                loc = np.flatnonzero(known_report_dates == pre_report_date)
+                pre_dates.append(record_dates[loc[-1]] if loc.size else None)
+            storage.append(pre_dates)
+
+        cache = pd.DataFrame(storage, index=data.index[ends - 1], columns=offset_strs)
         return pd.concat([data, cache], axis=1)
 
     @staticmethod
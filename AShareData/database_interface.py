@@ -9,13 +9,14 @@ import sqlalchemy as sa
 from sqlalchemy import Boolean, Column, Date, DateTime, extract, Float, Integer, Table, Text, VARCHAR
 from sqlalchemy.dialects.mysql import DOUBLE, insert
 from sqlalchemy.orm import Session
-from sqlalchemy.sql.expression import func, text
+from sqlalchemy.sql.expression import func, text, TextClause
 
 from . import utils
 
 
 class DBInterface(object):
     """Database Interface Base Class"""
+    _read_chunk_size = 200000
 
     def __init__(self):
         pass
@@ -61,6 +62,21 @@ class DBInterface(object):
         """Get a column from a table"""
         raise NotImplementedError()
 
+    def _read_sql(self, statement, parse_dates: Sequence[str] = None) -> pd.DataFrame:
+        """ 使用服务端游标分块读取查询结果, 避免一次性载入全部结果集
+
+        :param statement: 查询语句
+        :param parse_dates: 读取时直接解析为 ``datetime64[ns]`` 的列
+        """
+        with self.engine.connect() as conn:
+            conn = conn.execution_options(stream_results=True)
+            storage = [it for it in pd.read_sql(statement, con=conn, parse_dates=parse_dates,
+                                                chunksize=self._read_chunk_size)]
+        if not storage:
+            ret = pd.DataFrame(columns=[it.name for it in statement.columns])
+            return ret.astype({it: 'datetime64[ns]' for it in parse_dates}) if parse_dates else ret
+        return pd.concat(storage, ignore_index=True) if len(storage) > 1 else storage[0]
+
     def exist_table(self, table_name: str) -> bool:
         """Check if ``table_name`` exists in the database"""
         raise NotImplementedError()
@@ -206,9 +222,7 @@ class MySQLInterface(DBInterface):
         if df.empty:
             return
 
-        metadata = sa.MetaData(self.engine)
-        metadata.reflect()
-        table = metadata.tables[table_name.lower()]
+        table = self._get_table(table_name)
         flat_df = df.reset_index()
 
         date_cols = flat_df.select_dtypes(np.datetime64).columns.values.tolist()
@@ -231,11 +245,11 @@ class MySQLInterface(DBInterface):
         if df.empty:
             return
 
-        existing_data = self.read_table(table_name) if old_df is None else old_df
+        current_date = df.index.get_level_values('DateTime')[0]
+        existing_data = self.read_table(table_name, end_date=current_date) if old_df is None else old_df
         if existing_data.empty:
             self.update_df(df, table_name)
         else:
-            current_date = df.index.get_level_values('DateTime').to_pydatetime()[0]
             existing_data = existing_data.loc[existing_data.index.get_level_values('DateTime') < current_date]
             new_info = compute_diff(df, existing_data)
             self.update_df(new_info, table_name)
@@ -333,11 +347,7 @@ class MySQLInterface(DBInterface):
     # todo: TBD
     def clean_db(self, table_name: str) -> None:
         """清理表中多余的数据. 未实现"""
-        metadata = sa.MetaData(self.engine)
-        metadata.reflect()
-        if table_name not in self.meta.tables.keys():
-            raise ValueError(f'数据库中无名为 {table_name} 的表')
-        table = metadata.tables[table_name]
+        table = self._get_table(table_name)
         session = Session(self.engine)
         data = self.read_table(table_name).unstack()
 
@@ -351,7 +361,7 @@ class MySQLInterface(DBInterface):
                    dates: Union[Sequence[dt.datetime], dt.datetime] = None,
                    report_period: dt.datetime = None, report_month: int = None,
                    ids: Union[str, Sequence[str]] = None, constitute_ticker: str = None,
-                   text_statement: str = None) -> Union[pd.Series, pd.DataFrame]:
+                   text_statement: Union[str, TextClause] = None) -> Union[pd.Series, pd.DataFrame]:
         """ 读取数据库中的表
 
         :param table_name: 表名
@@ -363,59 +373,62 @@ class MySQLInterface(DBInterface):
         :param report_month: 报告月份
         :param ids: 合约代码
         :param constitute_ticker: 成分股代码
-        :param text_statement: SQL指令
+        :param text_statement: SQL指令, 含用户输入时应传入带绑定参数的 ``sqlalchemy.text``
         :return:
         """
         table_name = table_name.lower()
         index_col = self.get_table_primary_keys(table_name)
 
-        session = Session(self.engine)
         t = self.meta.tables[table_name]
-        q = session.query()
         if columns:
             if isinstance(columns, str):
                 columns = [columns]
-            columns.extend(index_col)
+            columns = list(columns) + (index_col if index_col else [])
         else:
             columns = [it.name for it in t.columns]
-        for it in columns:
-            q = q.add_columns(t.c[it])
+        q = sa.select([t.c[it] for it in columns])
         if dates is not None:
             if isinstance(dates, Sequence):
-                q = q.filter(t.columns['DateTime'].in_(dates))
+                q = q.where(t.columns['DateTime'].in_(dates))
             else:
-                q = q.filter(t.columns['DateTime'] == dates)
+                q = q.where(t.columns['DateTime'] == dates)
         if end_date is not None:
-            q = q.filter(t.columns['DateTime'] <= end_date)
+            q = q.where(t.columns['DateTime'] <= end_date)
         if start_date is not None:
-            q = q.filter(t.columns['DateTime'] >= start_date)
+            q = q.where(t.columns['DateTime'] >= start_date)
         if report_period is not None:
-            q = q.filter(t.columns['报告期'] == report_period)
+            q = q.where(t.columns['报告期'] == report_period)
         if report_month is not None:
-            q = q.filter(extract('month', t.columns['报告期']) == report_month)
-        if text_statement:
-            q = q.filter(text(text_statement))
+            q = q.where(extract('month', t.columns['报告期']) == report_month)
+        if text_statement is not None:
+            q = q.where(text(text_statement) if isinstance(text_statement, str) else text_statement)
         if (ids is not None) and ('ID' in columns):
             if isinstance(ids, str):
-                q = q.filter(t.columns['ID'] == ids)
+                q = q.where(t.columns['ID'] == ids)
             else:
-                q = q.filter(t.columns['ID'].in_(ids))
+                q = q.where(t.columns['ID'].in_(ids))
         if (constitute_ticker is not None) and ('ConstituteTicker' in columns):
-            q = q.filter(t.columns['ConstituteTicker'] == constitute_ticker)
+            q = q.where(t.columns['ConstituteTicker'] == constitute_ticker)
 
-        ret = pd.read_sql(q.statement, con=self.engine)
-        session.close()
+        parse_dates = [it for it in ['DateTime', '报告期'] if index_col and it in index_col]
+        ret = self._read_sql(q, parse_dates=parse_dates)
         if index_col:
-            if 'DateTime' in index_col:
-                ret.DateTime = pd.to_datetime(ret.DateTime)
-            if '报告期' in index_col:
-                ret['报告期'] = pd.to_datetime(ret['报告期'])
             ret = ret.set_index(index_col, drop=True)
 
         if ret.shape[1] == 1:
             ret = ret.iloc[:, 0]
         return ret
 
+    def _get_table(self, table_name: str) -> sa.Table:
+        """返回已反射的表. 若表不在缓存的元数据中(如由其他连接新建), 仅反射该表"""
+        table_name = table_name.lower()
+        if table_name not in self.meta.tables.keys():
+            try:
+                sa.Table(table_name, self.meta, autoload=True, autoload_with=self.engine)
+            except sa.exc.NoSuchTableError:
+                raise ValueError(f'数据库中无名为 {table_name} 的表')
+        return self.meta.tables[table_name]
+
     def exist_table(self, table_name: str) -> bool:
         """ 数据库中是否存在该表"""
         table_name = table_name.lower()
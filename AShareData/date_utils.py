@@ -100,7 +100,7 @@ class TradingCalendarBase(object):
             end_date = dt.datetime.now()
 
         if period is None or period.lower() == 'd':
-            dates = self._select_dates(start_date, end_date, lambda pre, curr, next_: True)
+            dates = self._select_dates(start_date, end_date)
             if dates and not inclusive[0]:
                 dates = dates[1:]
             if dates and not inclusive[1]:
@@ -5,8 +5,9 @@ from typing import List, Sequence, Union
 
 import numpy as np
 import pandas as pd
+from sqlalchemy import text
 
-from . import algo, constants, date_utils, utils
+from . import constants, date_utils, utils
 from .config import get_db_interface
 from .database_interface import DBInterface
 from .date_utils import SHSZTradingCalendar
@@ -207,7 +208,7 @@ class FactorBase(object):
         """analogue to max for each ``ID``"""
 
         def sub_get_data(self, **kwargs):
-            return self.f.get_data(**kwargs).unstack().max()
+            return utils.fast_unstack(self.f.get_data(**kwargs)).max()
 
         Foo = type('', (UnaryFactor,), {'_get_data': sub_get_data})
         return Foo(self)
@@ -227,7 +228,7 @@ class FactorBase(object):
         def sub_get_data(self, **kwargs):
             if 'start_date' in kwargs:
                 kwargs['start_date'] = self.calendar.offset(kwargs['start_date'], -1)
-            return self.f.get_data(**kwargs).unstack().pct_change().stack().dropna()
+            return utils.fast_unstack(self.f.get_data(**kwargs)).pct_change().stack().dropna()
 
         Foo = type('', (UnaryFactor,), {'_get_data': sub_get_data})
         return Foo(self)
@@ -238,7 +239,7 @@ class FactorBase(object):
         def sub_get_data(self, **kwargs):
             if 'start_date' in kwargs:
                 kwargs['start_date'] = self.calendar.offset(kwargs['start_date'], -1)
-            return self.f.get_data(**kwargs).unstack().diff().stack().dropna()
+            return utils.fast_unstack(self.f.get_data(**kwargs)).diff().stack().dropna()
 
         Foo = type('', (UnaryFactor,), {'_get_data': sub_get_data})
         return Foo(self)
@@ -251,7 +252,7 @@ class FactorBase(object):
                 kwargs['start_date'] = self.calendar.offset(kwargs['start_date'], n)
             elif 'end_date' in kwargs and n < 0:
                 kwargs['end_date'] = self.calendar.offset(kwargs['end_date'], n)
-            return self.f.get_data(**kwargs).unstack().shift(n).stack().dropna()
+            return utils.fast_unstack(self.f.get_data(**kwargs)).shift(n).stack().dropna()
 
         Foo = type('', (UnaryFactor,), {'_get_data': sub_get_data})
         return Foo(self)
@@ -264,7 +265,7 @@ class FactorBase(object):
                 kwargs['start_date'] = self.calendar.offset(kwargs['start_date'], n)
             elif 'end_date' in kwargs and n < 0:
                 kwargs['end_date'] = self.calendar.offset(kwargs['end_date'], n)
-            return self.f.get_data(**kwargs).unstack().diff().shift(n).stack().dropna()
+            return utils.fast_unstack(self.f.get_data(**kwargs)).diff().shift(n).stack().dropna()
 
         Foo = type('', (UnaryFactor,), {'_get_data': sub_get_data})
         return Foo(self)
@@ -277,7 +278,7 @@ class FactorBase(object):
                 kwargs['start_date'] = self.calendar.offset(kwargs['start_date'], n)
             elif 'end_date' in kwargs and n < 0:
                 kwargs['end_date'] = self.calendar.offset(kwargs['end_date'], n)
-            return self.f.get_data(**kwargs).unstack().pct_change().shift(n).stack().dropna()
+            return utils.fast_unstack(self.f.get_data(**kwargs)).pct_change().shift(n).stack().dropna()
 
         Foo = type('', (UnaryFactor,), {'_get_data': sub_get_data})
         return Foo(self)
@@ -377,7 +378,8 @@ class IndexConstitute(Factor):
 
     def _get_data(self, index_ticker: str, date: date_utils.DateType):
         date_str = date_utils.date_type2str(date, '-')
-        stm = f'DateTime = (SELECT MAX(DateTime) FROM `{self.table_name}` WHERE DateTime <= "{date_str}")'
+        stm = text(f'DateTime = (SELECT MAX(DateTime) FROM `{self.table_name}` WHERE DateTime <= :date)')
+        stm = stm.bindparams(date=date_str)
         ret = self.db_interface.read_table(self.table_name, ids=index_ticker, text_statement=stm)
         ret.index = pd.MultiIndex.from_product([[date], ret.index.get_level_values('ID')])
         ret.index.names = ['DateTime', 'ID']
@@ -434,7 +436,7 @@ class CompactFactor(NonFinancialFactor):
         """
         if isinstance(dates, dt.datetime):
             dates = [dates]
-        data = self.data.copy()
+        data = self.data
         if ids:
             if isinstance(ids, str):
                 ids = [ids]
@@ -456,7 +458,7 @@ class CompactFactor(NonFinancialFactor):
         data = pd.concat([previous_data, ranged_data])
 
         date_list = self.calendar.select_dates(start_date=start_date, end_date=end_date)
-        df = data.unstack().reindex(date_list).ffill()
+        df = data.unstack().reindex(pd.DatetimeIndex(date_list)).ffill()
         if dates:
             df = df.loc[dates, :]
         ret = df.stack()
@@ -472,6 +474,8 @@ class IndustryFactor(CompactFactor):
     股票行业分类
     """
 
+    translation = {}
+
     def __init__(self, provider: str, level: int, db_interface: DBInterface = None) -> None:
         """
         :param db_interface: DB Interface
@@ -485,10 +489,9 @@ class IndustryFactor(CompactFactor):
         self.name = f'{provider}{level}级行业'
 
         if level != constants.INDUSTRY_LEVEL[provider]:
-            translation = utils.load_param('industry.json')
-            new_translation = {}
-            for key, value in translation[table_name].items():
-                new_translation[key] = value[f'level_{level}']
+            if len(self.translation) == 0:
+                self.translation.update(utils.load_param('industry.json'))
+            new_translation = {key: value[f'level_{level}'] for key, value in self.translation[table_name].items()}
 
             self.data = self.data.map(new_translation)
 
@@ -658,33 +661,28 @@ class AccountingFactor(Factor):
         db_columns = [self._factor_name]
         if self.offset_strs:
             db_columns.extend(self.offset_strs)
-        data = self.db_interface.read_table(self.table_name, columns=db_columns,
-                                            start_date=buffer_start, end_date=end_date, report_month=self.report_month,
-                                            ids=ids)
+        data = self.db_interface.read_table(self.table_name, columns=db_columns, start_date=buffer_start,
+                                            end_date=db_end_date, report_month=self.report_month, ids=ids)
         if isinstance(data, pd.Series):
             data = data.to_frame()
-        tickers = data.index.get_level_values('ID').unique().tolist()
-        storage = []
-        for ticker in tickers:
-            ticker_data = data.loc[(slice(None), ticker, slice(None)), :]
-            related_dates = algo.get_less_or_equal_of_a_in_b(a=dates,
-                                                             b=ticker_data.index.get_level_values('DateTime').tolist())
-            relevant_rec = ticker_data.loc[ticker_data.index.get_level_values('DateTime').isin(related_dates.values())]
-            relevant_rec = relevant_rec.groupby('DateTime').tail(1)
-
-            pre_data = self.gather_data(ticker_data, relevant_rec, self.offset_strs)
-            calc_data = self.func(pre_data)
-            calc_data.index = calc_data.index.get_level_values('DateTime')
-
-            res_index = pd.MultiIndex.from_product([list(related_dates.keys()), [ticker]], names=('DateTime', 'ID'))
-            val = calc_data.loc[related_dates.values()].values
-            content = pd.DataFrame(val, index=res_index)
-            storage.append(content)
-
-        ret = pd.concat(storage)
-        if ret.shape[1] == 1:
-            ret = ret.iloc[:, 0]
-            ret.name = self._factor_name
+        data = data.sort_index()
+        # last record(latest 报告期) of each ticker on each announcement date
+        records = data.groupby(level=['DateTime', 'ID']).tail(1)
+
+        # for each (date, ticker), locate the latest announcement date on or before it
+        record_keys = records.index.droplevel('报告期').to_frame(index=False)
+        record_keys['记录时间'] = record_keys['DateTime']
+        query = pd.MultiIndex.from_product([sorted(dates), record_keys['ID'].unique()], names=('DateTime', 'ID'))
+        matched = pd.merge_asof(query.to_frame(index=False), record_keys, on='DateTime', by='ID')
+        matched = matched.dropna(subset=['记录时间'])
+        matched_records = pd.MultiIndex.from_frame(matched.loc[:, ['记录时间', 'ID']])
+
+        relevant_rec = records.loc[records.index.droplevel('报告期').isin(matched_records)]
+        pre_data = self.gather_data(data, relevant_rec, self.offset_strs)
+        calc_data = self.func(pre_data).droplevel('报告期')
+
+        res_index = pd.MultiIndex.from_frame(matched.loc[:, ['DateTime', 'ID']])
+        ret = pd.Series(calc_data.reindex(matched_records).values, index=res_index, name=self._factor_name)
 
         if ticker_selector:
             index = ticker_selector.generate_index(dates=dates)
@@ -695,24 +693,22 @@ class AccountingFactor(Factor):
     def func(data: pd.DataFrame) -> np.float:
         raise NotImplementedError()
 
-    def gather_data(self, ticker_data: pd.DataFrame, relevant_rec: pd.DataFrame,
-                    offset_strs: List[str]) -> pd.DataFrame:
+    def gather_data(self, data: pd.DataFrame, relevant_rec: pd.DataFrame, offset_strs: List[str]) -> pd.DataFrame:
         if not offset_strs:
             relevant_rec.columns = ['q0']
             return relevant_rec
-        storage = [self.loc_pre_data(ticker_data, relevant_rec, offset_str).iloc[:, 0].values for offset_str in
-                   offset_strs]
+        storage = [self.loc_pre_data(data, relevant_rec, offset_str).iloc[:, 0].values for offset_str in offset_strs]
         storage.append(relevant_rec.iloc[:, 0].values)
         col_names = offset_strs + ['q0']
         return pd.DataFrame(np.stack(storage, axis=1), index=relevant_rec.index, columns=col_names)
 
     @staticmethod
-    def loc_pre_data(ticker_data: pd.DataFrame, relevant_rec: pd.DataFrame, offset_str: str) -> pd.DataFrame:
+    def loc_pre_data(data: pd.DataFrame, relevant_rec: pd.DataFrame, offset_str: str) -> pd.DataFrame:
         pre_date = [date_utils.ReportingDate.offset(it, offset_str) for it in
                     relevant_rec.index.get_level_values('报告期')]
-        ticker = ticker_data.index.get_level_values('ID')[0]
-        pre_index = pd.MultiIndex.from_arrays([relevant_rec[offset_str], [ticker] * relevant_rec.shape[0], pre_date])
-        pre_data = ticker_data.reindex(pre_index)
+        pre_index = pd.MultiIndex.from_arrays([relevant_rec[offset_str], relevant_rec.index.get_level_values('ID'),
+                                               pre_date])
+        pre_data = data.reindex(pre_index)
         return pre_data
 
 
@@ -897,17 +893,20 @@ class BetaFactor(FactorBase):
             rf_data = self.rf_rate.get_data(start_date=start_date, end_date=end_date).reset_index()
             combined_data = pd.merge(stock_data, market_data, on='DateTime')
             combined_data = pd.merge(combined_data, rf_data, on='DateTime')
-            combined_data.iloc[:, 2] = combined_data.iloc[:, 2] - combined_data.iloc[:, -1]
-            combined_data.iloc[:, 3] = combined_data.iloc[:, 3] - combined_data.iloc[:, -1]
-
-            for ID, group in combined_data.groupby('ID'):
-                if group.shape[0] < min_trading_days:
-                    beta = np.nan
-                else:
-                    cov_matrix = np.cov(group.iloc[:, 2], group.iloc[:, 3])
-                    beta = cov_matrix[0, 1] / cov_matrix[1, 1]
-                data = pd.Series(beta, index=pd.MultiIndex.from_tuples([(date, ID)], names=('DateTime', 'ID')))
-                storage.append(data)
+            stock_excess_ret = combined_data.iloc[:, 2] - combined_data.iloc[:, -1]
+            market_excess_ret = combined_data.iloc[:, 3] - combined_data.iloc[:, -1]
+
+            # beta = cov(r_i, r_m) / var(r_m), computed for all IDs at once
+            grouper = combined_data['ID']
+            stock_demeaned = stock_excess_ret - stock_excess_ret.groupby(grouper).transform('mean')
+            market_demeaned = market_excess_ret - market_excess_ret.groupby(grouper).transform('mean')
+            cov = (stock_demeaned * market_demeaned).groupby(grouper).sum()
+            var = (market_demeaned ** 2).groupby(grouper).sum()
+            has_nan = (stock_excess_ret.isna() | market_excess_ret.isna()).groupby(grouper).any()
+            valid = (grouper.groupby(grouper).size() >= min_trading_days) & ~has_nan
+            beta = (cov / var).where(valid)
+            beta.index = pd.MultiIndex.from_product([[date], beta.index], names=('DateTime', 'ID'))
+            storage.append(beta)
 
         ret = pd.concat(storage).sort_index()
         return ret
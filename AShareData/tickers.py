@@ -6,6 +6,7 @@ from typing import Dict, List, Sequence, Union
 import pandas as pd
 from dateutil.relativedelta import relativedelta
 from singleton_decorator import singleton
+from sqlalchemy import text
 
 from . import date_utils
 from .config import get_db_interface
@@ -40,8 +41,7 @@ class TickersBase(object):
         if date is None:
             date = dt.datetime.today()
         stock_ticker_df = self.cache.loc[self.cache.DateTime <= date]
-        tmp = stock_ticker_df.groupby('ID').tail(1)
-        return sorted(tmp.loc[tmp['上市状态'] == 1, 'ID'].tolist())
+        return self._listed_ticker(stock_ticker_df)
 
     def list_date(self) -> Dict[str, dt.datetime]:
         """ return the list date of all tickers"""
@@ -62,8 +62,13 @@ class TickersBase(object):
         if start_date is None:
             start_date = dt.datetime(1990, 12, 10)
         u_data = self.cache.loc[(start_date <= self.cache.DateTime) & (self.cache.DateTime <= end_date), :]
-        tmp = u_data.groupby('ID').tail(1)
-        return sorted(tmp.loc[tmp['上市状态'] == 1, 'ID'].tolist())
+        return self._listed_ticker(u_data)
+
+    @staticmethod
+    def _listed_ticker(data: pd.DataFrame) -> List[str]:
+        """ return sorted tickers whose last record in `data` is listed"""
+        last_state = data.groupby('ID')['上市状态'].last()
+        return last_state.index[last_state.eq(1)].tolist()
 
 
 class DiscreteTickers(TickersBase):
@@ -71,7 +76,8 @@ class DiscreteTickers(TickersBase):
 
     def __init__(self, asset_type: str, db_interface: DBInterface = None) -> None:
         super().__init__(db_interface)
-        self.cache = self.db_interface.read_table('证券代码', text_statement=f'证券类型="{asset_type}"').reset_index()
+        stm = text('证券类型 = :asset_type').bindparams(asset_type=asset_type)
+        self.cache = self.db_interface.read_table('证券代码', text_statement=stm).reset_index()
 
 
 class StockTickers(DiscreteTickers):
@@ -1,4 +1,6 @@
 import datetime as dt
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Sequence
 
 import matplotlib.pyplot as plt
 import matplotlib.ticker as mtick
@@ -24,18 +26,48 @@ class MajorIndustryConstitutes(object):
         self.cap = cap if cap else self.data_reader.stock_free_floating_market_cap
 
     def get_major_constitute(self, name: str, n: int = None):
-        if name not in self.industry.all_industries:
-            raise ValueError(f'unknown industry: {name}')
-        constitute = self.industry.list_constitutes(date=self.date, industry=name)
-        val = self.cap.get_data(ids=constitute, dates=self.date) / 1e8
+        return self.get_major_constitutes([name], n)[name]
+
+    def get_major_constitutes(self, names: Sequence[str], n: int = None) -> Dict[str, pd.DataFrame]:
+        """ 行业内市值最大的成分股, 所有行业的成分股数据一次性读取
+
+        :param names: 行业名称
+        :param n: 每个行业返回的股票数量, 默认全部返回
+        :return: {行业名称: 成分股信息}
+        """
+        for name in names:
+            if name not in self.industry.all_industries:
+                raise ValueError(f'unknown industry: {name}')
+        if not names:
+            return {}
+        industry_data = self.industry.get_data(dates=self.date)
+        constitutes = {name: industry_data.loc[industry_data == name].index.get_level_values('ID').tolist()
+                       for name in names}
+        universe = sorted(set().union(*constitutes.values()))
+        if not universe:
+            return {name: pd.DataFrame() for name in names}
+
+        val = self.cap.get_data(ids=universe, dates=self.date) / 1e8
         if n:
-            val = val.sort_values(ascending=False)
-            val = val.head(n)
-            constitute = val.index.get_level_values('ID').tolist()
-        sec_name = self.data_reader.sec_name.get_data(ids=constitute, dates=self.date)
-        pe = self.data_reader.pe_ttm.get_data(ids=constitute, dates=self.date)
-        pb = self.data_reader.pb.get_data(ids=constitute, dates=self.date)
-        ret = pd.concat([sec_name, val, pe, pb], axis=1).sort_values(val.name, ascending=False)
+            selected = {}
+            for name, constitute in constitutes.items():
+                industry_val = val.loc[val.index.get_level_values('ID').isin(constitute)]
+                selected[name] = industry_val.nlargest(n).index.get_level_values('ID').tolist()
+        else:
+            selected = constitutes
+        selected_ids = sorted(set().union(*selected.values()))
+        if not selected_ids:
+            return {name: pd.DataFrame() for name in names}
+
+        sec_name = self.data_reader.sec_name.get_data(ids=selected_ids, dates=self.date)
+        pe = self.data_reader.pe_ttm.get_data(ids=selected_ids, dates=self.date)
+        pb = self.data_reader.pb.get_data(ids=selected_ids, dates=self.date)
+        info = pd.concat([sec_name, val, pe, pb], axis=1)
+
+        ret = {}
+        for name, ids in selected.items():
+            industry_info = info.loc[info.index.get_level_values('ID').isin(ids)]
+            ret[name] = industry_info.sort_values(val.name, ascending=False)
         return ret
 
 
@@ -53,12 +85,15 @@ class IndexHighlighter(object):
         self.tbd_indexes = list(set(self.tickers) - set(self.must_keep_indexes))
         start_date = self.calendar.offset(date, -22)
         index_factor = ContinuousFactor('自合成指数', '收益率', db_interface=self.db_interface)
-        self.cache = index_factor.get_data(start_date=start_date, end_date=date).unstack()
+        self.cache = utils.fast_unstack(index_factor.get_data(start_date=start_date, end_date=date))
+        self.cum_ret_cache = (self.cache + 1).cumprod()
         self.industry_cache = []
 
     def featured_data(self, look_back_period: int, n: int) -> pd.DataFrame:
-        data = self.cache.iloc[-look_back_period:, :]
-        data = (data + 1).cumprod()
+        # cumulative return over the window = full cumprod / its last known value before the window
+        base = self.cum_ret_cache.iloc[:-look_back_period, :].ffill()
+        base = 1 if base.empty else base.iloc[-1, :].fillna(1)
+        data = self.cum_ret_cache.iloc[-look_back_period:, :] / base
         tmp = data.loc[data.index[-1], self.tbd_indexes].sort_values()
         ordered_index = tmp.index.tolist()
         cols = ordered_index[:n] + ordered_index[-n:]
@@ -87,9 +122,10 @@ class IndexHighlighter(object):
         self.plot_index(20, 3)
         mentioned_industry = [it[2:-4] for it in set(self.industry_cache) if it.startswith('申万')]
         constitute = MajorIndustryConstitutes(provider='申万', level=2)
+        major_constitutes = constitute.get_major_constitutes(mentioned_industry, 10)
         for it in mentioned_industry:
             print(f'申万2级行业 - {it}')
-            print(constitute.get_major_constitute(it, 10))
+            print(major_constitutes[it])
             print('')
 
 
@@ -123,12 +159,16 @@ class StockIndexFutureBasis(object):
     def compute(self) -> pd.DataFrame:
         start_date = self.cal.offset(self.date, -self.look_back_period)
         tickers = self.stock_index_tickers.ticker()
-        tickers_info = self.db_interface.read_table('期货合约', '最后交易日', ids=tickers).to_frame()
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            tickers_info = executor.submit(self.db_interface.read_table, '期货合约', '最后交易日', ids=tickers)
+            index_close = executor.submit(self.data_reader.index_close.get_data, start_date=start_date,
+                                          end_date=self.date, ids=list(self.FUTURE_INDEX_MAP.values()))
+            future_close = executor.submit(self.data_reader.future_close.get_data, start_date=start_date,
+                                           end_date=self.date, ids=tickers)
+            tickers_info = tickers_info.result().to_frame()
+            index_close = index_close.result().reset_index()
+            future_close = future_close.result().reset_index()
         tickers_info['index_ticker'] = [self.FUTURE_INDEX_MAP[it[:2]] for it in tickers_info.index]
-        index_close = self.data_reader.index_close.get_data(start_date=start_date, end_date=self.date,
-                                                            ids=list(self.FUTURE_INDEX_MAP.values())).reset_index()
-        future_close = self.data_reader.future_close.get_data(start_date=start_date, end_date=self.date,
-                                                              ids=tickers).reset_index()
         tmp = pd.merge(future_close, tickers_info, left_on='ID', right_index=True)
         df = pd.merge(tmp, index_close, left_on=['DateTime', 'index_ticker'], right_on=['DateTime', 'ID']).rename(
             {'ID_x': 'ID'}, axis=1)
@@ -115,6 +115,26 @@ def get_stock_board_name(ticker: str) -> str:
         return '非股票'
 
 
+def fast_unstack(data: Union[pd.Series, pd.DataFrame]) -> pd.DataFrame:
+    """ ``data.unstack()`` 的快速实现
+
+    若 ``data`` 为两层索引的 ``Series`` 且索引为两层取值的笛卡尔积(如每个交易日所有证券均有记录), 直接 reshape 数据. 否则退回 ``unstack``.
+    ``object`` 类型的数值数据先转换为数值类型, 以使用 ``unstack`` 的数值实现
+    """
+    if isinstance(data, pd.Series) and data.dtype == object:
+        data = data.infer_objects()
+    if isinstance(data, pd.Series) and data.index.nlevels == 2:
+        if not data.index.is_monotonic_increasing:
+            data = data.sort_index()
+        index = data.index.remove_unused_levels()
+        n_rows, n_cols = len(index.levels[0]), len(index.levels[1])
+        if data.shape[0] == n_rows * n_cols and index.is_unique:
+            rows = index[::n_cols].get_level_values(0)
+            cols = index[:n_cols].get_level_values(1)
+            return pd.DataFrame(data.values.reshape(n_rows, n_cols), index=rows, columns=cols)
+    return data.unstack()
+
+
 class SecuritySelectionPolicy:
     pass
 
@@ -1,7 +1,10 @@
 import unittest
 import datetime as dt
 
+import sqlalchemy as sa
+
 from AShareData.config import get_db_interface, set_global_config
+from AShareData.database_interface import DBInterface
 from AShareData.date_utils import date_type2datetime
 
 
@@ -32,5 +35,44 @@ class MyTestCase(unittest.TestCase):
         print(self.db_interface.get_latest_timestamp(table_name, default_ts=dt.datetime(2021, 3, 4)))
 
 
+class StreamedReadTestCase(unittest.TestCase):
+    """服务端游标分块读取时不丢失记录. 用 sqlite 模拟 MySQL 驱动的服务端游标"""
+
+    class SQLiteInterface(DBInterface):
+        def __init__(self, engine: sa.engine.Engine):
+            super().__init__()
+            self.engine = engine
+
+    def setUp(self) -> None:
+        engine = sa.create_engine('sqlite://')
+        meta = sa.MetaData()
+        self.table = sa.Table('股票日行情', meta, sa.Column('ID', sa.String(20), primary_key=True),
+                              sa.Column('收盘价', sa.Float))
+        meta.create_all(engine)
+        self.records = [{'ID': f'00000{i}.SZ', '收盘价': float(i)} for i in range(1, 6)]
+        engine.execute(self.table.insert(), self.records)
+
+        # stream_results=True 时, 与 mysqlclient / PyMySQL 一样返回 BufferedRowResultProxy
+        engine.dialect.supports_server_side_cursors = True
+        engine.dialect.server_side_cursors = False
+        engine.dialect.execution_ctx_cls = type('ServerSideExecutionContext', (engine.dialect.execution_ctx_cls,), {
+            'create_server_side_cursor': lambda self: self._dbapi_connection.cursor()})
+        self.db_interface = self.SQLiteInterface(engine)
+
+    def test_streamed_read(self):
+        for chunk_size in [2, 5, 10]:
+            self.db_interface._read_chunk_size = chunk_size
+            ret = self.db_interface._read_sql(sa.select([self.table]).order_by(self.table.c.ID))
+            self.assertEqual(ret.shape[0], len(self.records))
+            self.assertEqual(ret['ID'].iloc[0], self.records[0]['ID'])
+            self.assertEqual(ret['收盘价'].tolist(), [it['收盘价'] for it in self.records])
+
+    def test_single_row(self):
+        statement = sa.select([self.table]).where(self.table.c.ID == '000001.SZ')
+        ret = self.db_interface._read_sql(statement)
+        self.assertEqual(ret.shape[0], 1)
+        self.assertEqual(ret['收盘价'].iloc[0], 1)
+
+
 if __name__ == '__main__':
     unittest.main()
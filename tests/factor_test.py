@@ -1,5 +1,7 @@
 import unittest
 
+import pandas as pd
+
 from AShareData import set_global_config
 from AShareData.factor import *
 from AShareData.tickers import *
@@ -143,5 +145,65 @@ class MyTestCase(unittest.TestCase):
         print(latest_update_factor.get_data(ids='008864.OF'))
 
 
+class AccountingFactorTestCase(unittest.TestCase):
+    """AccountingFactor 在内存数据上的取值, 无需数据库"""
+
+    class FakeDBInterface(object):
+        def __init__(self, data: pd.DataFrame):
+            self.data = data
+
+        def read_table(self, table_name, columns=None, start_date=None, end_date=None, report_month=None, ids=None):
+            if table_name == '交易日历':
+                return pd.DataFrame({'交易日期': pd.bdate_range('2018-01-01', '2021-12-31')})
+            data = self.data.loc[:, columns]
+            if start_date is not None:
+                data = data.loc[data.index.get_level_values('DateTime') >= start_date]
+            if end_date is not None:
+                data = data.loc[data.index.get_level_values('DateTime') <= end_date]
+            if ids:
+                data = data.loc[data.index.get_level_values('ID').isin(ids)]
+            return data.iloc[:, 0] if data.shape[1] == 1 else data
+
+    def setUp(self) -> None:
+        d = dt.datetime
+        nat = pd.NaT
+        # DateTime, ID, 报告期, 期末总股本, q1, q4
+        records = [
+            (d(2019, 4, 25), 'A', d(2019, 3, 31), 88, nat, nat),
+            (d(2019, 10, 25), 'A', d(2019, 9, 30), 80, nat, nat),
+            (d(2020, 4, 20), 'A', d(2019, 12, 31), 100, d(2019, 10, 25), nat),
+            # 同一公告日发布两期报告, 以最新一期为准
+            (d(2020, 4, 28), 'A', d(2019, 12, 31), 105, d(2019, 10, 25), nat),
+            (d(2020, 4, 28), 'A', d(2020, 3, 31), 110, d(2020, 4, 28), d(2019, 4, 25)),
+            (d(2020, 8, 25), 'A', d(2020, 6, 30), 121, d(2020, 4, 28), nat),
+            (d(2020, 3, 15), 'B', d(2019, 12, 31), 50, nat, nat),
+            (d(2020, 8, 20), 'B', d(2020, 6, 30), 60, nat, nat),
+        ]
+        data = pd.DataFrame(records, columns=['DateTime', 'ID', '报告期', '期末总股本', 'q1', 'q4'])
+        data['期末总股本'] = data['期末总股本'].astype(float)
+        self.db_interface = self.FakeDBInterface(data.set_index(['DateTime', 'ID', '报告期']).sort_index())
+        SHSZTradingCalendar(self.db_interface)
+        self.dates = [d(2020, 1, 1), d(2020, 4, 21), d(2020, 4, 28), d(2020, 9, 1)]
+        self.index = pd.MultiIndex.from_tuples([(self.dates[0], 'A'), (self.dates[1], 'A'), (self.dates[1], 'B'),
+                                                (self.dates[2], 'A'), (self.dates[2], 'B'), (self.dates[3], 'A'),
+                                                (self.dates[3], 'B')], names=['DateTime', 'ID'])
+
+    def check(self, factor: AccountingFactor, expected):
+        ret = factor.get_data(dates=self.dates).sort_index()
+        pd.testing.assert_series_equal(ret, pd.Series(expected, index=self.index, dtype=float), check_names=False)
+
+    def test_latest_accounting_factor(self):
+        f = LatestAccountingFactor('期末总股本', self.db_interface)
+        self.check(f, [80, 100, 50, 110, 50, 121, 60])
+
+    def test_latest_quarter_accounting_factor(self):
+        f = LatestQuarterAccountingFactor('期末总股本', self.db_interface)
+        self.check(f, [None, 100 / 80 - 1, None, 110 / 105 - 1, None, 121 / 110 - 1, None])
+
+    def test_yoy_period_accounting_factor(self):
+        f = YOYPeriodAccountingFactor('期末总股本', self.db_interface)
+        self.check(f, [None, None, None, 110 / 88 - 1, None, None, None])
+
+
 if __name__ == '__main__':
     unittest.main()
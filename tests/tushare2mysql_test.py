@@ -1,5 +1,8 @@
+import datetime as dt
 import unittest
 
+import pandas as pd
+
 from AShareData import set_global_config, TushareData
 
 
@@ -49,5 +52,34 @@ class Tushare2MySQLTest(unittest.TestCase):
         self.downloader.get_index_weight(start_date='20050101')
 
 
+class AppendReportDateCacheTestCase(unittest.TestCase):
+    def test_append_report_date_cache(self):
+        d = dt.datetime
+        index = pd.MultiIndex.from_tuples([
+            (d(2018, 4, 25), '000001.SZ', d(2018, 3, 31)),
+            (d(2018, 10, 25), '000001.SZ', d(2018, 9, 30)),
+            (d(2019, 4, 20), '000001.SZ', d(2018, 12, 31)),
+            (d(2019, 4, 20), '000001.SZ', d(2019, 3, 31)),
+            # 年报更正
+            (d(2019, 4, 30), '000001.SZ', d(2018, 12, 31)),
+            (d(2019, 10, 25), '000001.SZ', d(2019, 9, 30)),
+        ], names=['DateTime', 'ID', '报告期'])
+        data = pd.DataFrame({'净利润': range(len(index))}, index=index, dtype=float)
+
+        ret = TushareData.append_report_date_cache(data)
+
+        offset_strs = ['q1', 'q2', 'q4', 'q5', 'y1', 'y2', 'y3', 'y5']
+        expected = pd.DataFrame(None, index=index, columns=offset_strs, dtype='datetime64[ns]')
+        expected.loc[index[1], 'q2'] = d(2018, 4, 25)
+        expected.loc[index[3], ['q1', 'q2', 'q4', 'y1']] = [d(2019, 4, 20), d(2018, 10, 25), d(2018, 4, 25),
+                                                            d(2019, 4, 20)]
+        expected.loc[index[4], 'q1'] = d(2018, 10, 25)
+        expected.loc[index[5], ['q2', 'q4', 'y1']] = [d(2019, 4, 20), d(2018, 10, 25), d(2019, 4, 30)]
+
+        pd.testing.assert_frame_equal(ret[['净利润']], data)
+        pd.testing.assert_frame_equal(ret[offset_strs].apply(pd.to_datetime), expected)
+        pd.testing.assert_frame_equal(TushareData.append_report_date_cache(data.iloc[::-1]), ret)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,40 @@
+import datetime as dt
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from AShareData.utils import fast_unstack
+
+
+class FastUnstackTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        dates = [dt.datetime(2021, 1, 4), dt.datetime(2021, 1, 5), dt.datetime(2021, 1, 6)]
+        ids = ['600000.SH', '000001.SZ', '000002.SZ']
+        index = pd.MultiIndex.from_product([dates, ids], names=['DateTime', 'ID'])
+        self.data = pd.Series(np.arange(len(index), dtype=float), index=index, name='收盘价')
+
+    def check(self, data: pd.Series):
+        pd.testing.assert_frame_equal(fast_unstack(data), data.unstack())
+
+    def test_full_product_index(self):
+        self.check(self.data.sort_index())
+
+    def test_unsorted_index(self):
+        self.check(self.data)
+        self.check(self.data.iloc[::-1])
+
+    def test_sparse_index(self):
+        self.check(self.data.drop(self.data.index[4]))
+
+    def test_object_numbers(self):
+        data = self.data.astype(object)
+        ret = fast_unstack(data)
+        pd.testing.assert_frame_equal(ret, self.data.unstack())
+        self.assertTrue((ret.dtypes == float).all())
+        sparse_ret = fast_unstack(data.drop(data.index[4]))
+        pd.testing.assert_frame_equal(sparse_ret, self.data.drop(self.data.index[4]).unstack())
+
+
+if __name__ == '__main__':
+    unittest.main()